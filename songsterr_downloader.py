@@ -5,8 +5,38 @@ import re
 import json
 import time
 import argparse
+import bisect
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import unquote, urlparse
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+
+def _dumps_indented(obj) -> bytes:
+    """Serialize obj as UTF-8 JSON indented by two spaces."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+# ASCII characters outside [\w\s-] are dropped and '-' becomes a space, so
+# runs of separators can be collapsed with a plain split/join.
+_SANITIZE_TABLE = str.maketrans({
+    c: (' ' if c == '-' else None)
+    for c in map(chr, range(128))
+    if not (c.isalnum() or c == '_' or c.isspace())
+})
+_NON_WORD_RE = re.compile(r'[^\w\s-]')
+_STATE_RE = re.compile(r'<script id="state"[^>]*>([^<]+)</script>')
+_TRACK_IDX_RE = re.compile(r'/(\d+)\.json$')
+_NETWORK_METHODS = frozenset(('Network.requestWillBeSent', 'Network.responseReceived'))
+
 def ensure_packages(include_pdf=False):
     """Ensure all required packages are installed."""
     required = ['selenium', 'webdriver-manager', 'requests']
@@ -21,24 +51,132 @@ def ensure_packages(include_pdf=False):
 
 ensure_packages()
 
+_rl_canvas = None
+
+
+def _import_pdf_packages():
+    """Load the optional PDF generation modules into module scope."""
+    global A4, mm, _rl_canvas, black, gray, white
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+        from reportlab.pdfgen import canvas as _rl_canvas
+        from reportlab.lib.colors import black, gray, white
+    except ImportError:
+        return False
+    return True
+
+_import_pdf_packages()
+
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 import requests
+from requests.adapters import HTTPAdapter
+
+# urllib3 can only decode 'br' responses when a brotli package is installed.
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+_ACCEPT_ENCODING = 'gzip, br' if brotli else 'gzip'
+
+_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+               '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+# Shared by the page fetch and the track download workers so connections to
+# Songsterr and the CDN are kept alive between requests.
+_SESSION = requests.Session()
+_SESSION.headers.update({'Accept-Encoding': _ACCEPT_ENCODING, 'User-Agent': _USER_AGENT})
+_SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=2))
+
+_DRIVER_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'pysongsterr', 'driver_path')
+_CHROME_BINARIES = (
+    'google-chrome',
+    'google-chrome-stable',
+    'chromium',
+    'chromium-browser',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+)
+# chrome.exe --version prints nothing on Windows; the installed version is in the registry.
+_CHROME_REGISTRY_KEY = r'Software\Google\Chrome\BLBeacon'
+_VERSION_RE = re.compile(r'(\d+)\.\d+')
+
+
+def _windows_chrome_version():
+    """Read the installed Chrome version string from the Windows registry."""
+    import winreg
+    for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            with winreg.OpenKey(hive, _CHROME_REGISTRY_KEY) as key:
+                return winreg.QueryValueEx(key, 'version')[0]
+        except OSError:
+            continue
+    return None
+
+
+def _chrome_version_strings():
+    """Yield candidate Chrome version strings for this platform."""
+    if sys.platform == 'win32':
+        yield _windows_chrome_version() or ''
+        return
+    for binary in _CHROME_BINARIES:
+        try:
+            output = subprocess.check_output([binary, '--version'], stderr=subprocess.DEVNULL, timeout=10)
+        except (OSError, subprocess.SubprocessError):
+            continue
+        yield output.decode(errors='replace')
+
+
+def _chrome_major_version():
+    """Return the installed Chrome major version, or None if it cannot be determined."""
+    for output in _chrome_version_strings():
+        match = _VERSION_RE.search(output)
+        if match:
+            return match.group(1)
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _driver_path():
+    """Resolve the ChromeDriver path, reusing the cached one while Chrome's major version is unchanged."""
+    chrome_version = _chrome_major_version()
+    
+    if chrome_version:
+        try:
+            with open(_DRIVER_CACHE_PATH, 'rb') as f:
+                cached = _loads(f.read())
+            cached_path = cached.get('driver_path')
+            if (cached.get('chrome_version') == chrome_version
+                    and isinstance(cached_path, str) and os.path.isfile(cached_path)):
+                return cached_path
+        except (OSError, ValueError, AttributeError):
+            pass
+    
+    path = ChromeDriverManager().install()
+    
+    if chrome_version:
+        try:
+            os.makedirs(os.path.dirname(_DRIVER_CACHE_PATH), exist_ok=True)
+            with open(_DRIVER_CACHE_PATH, 'wb') as f:
+                f.write(_dumps_indented({'chrome_version': chrome_version, 'driver_path': path}))
+        except OSError:
+            pass
+    
+    return path
 
 
 class TabToPDF:
     """Converts JSON tab data to PDF tablature with proper musical notation."""
     
-    MIDI_TO_NOTE = {
-        28: 'E', 33: 'A', 38: 'D', 43: 'G', 48: 'C',
-        40: 'E', 45: 'A', 50: 'D', 55: 'G', 59: 'B', 64: 'e',
-        36: 'C', 41: 'F', 46: 'B',
-    }
+    NOTE_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
     
     DURATION_SYMBOLS = {
         1: 'w',
@@ -50,55 +188,153 @@ class TabToPDF:
     }
     
     def __init__(self):
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib.units import mm
+        if _rl_canvas is None:
+            raise ImportError("reportlab is required for PDF generation")
+        self._canvas_cls = _rl_canvas.Canvas
+        self._black, self._gray, self._white = black, gray, white
         self.A4 = A4
         self.mm = mm
+        self._1mm = 1 * mm
+        self._2mm = 2 * mm
+        self._3mm = 3 * mm
+        self._4mm = 4 * mm
+        self._6mm = 6 * mm
         self.page_size = A4
         self.margin = 15 * mm
         self.string_spacing = 3.2 * mm
         self.measures_per_line = 4
         self.line_spacing = 18 * mm
         self.header_height = 25 * mm
+        self._fret_labels = {}
         
     def _find_first_content_measure(self, measures):
         """Find the first measure that has actual notes (not just rests)."""
         for i, measure in enumerate(measures):
             if not measure.get('rest', False):
-                return max(0, i)
+                return i
         return 0
     
-    def _get_tempo_at_measure(self, automations, measure_idx):
+    def _fret_label(self, c, fret):
+        """Return the fret string and its rendered width, memoized per fret value."""
+        label = self._fret_labels.get(fret)
+        if label is None:
+            fret_str = str(fret)
+            label = self._fret_labels[fret] = (fret_str, c.stringWidth(fret_str, "Courier-Bold", 9))
+        return label
+    
+    def _flatten_measure(self, measure, usable_measure_width):
+        """Flatten the first voice of a measure into note and stem lists.
+        
+        Returns (notes, stems): notes holds (x_offset, string_idx, fret) and
+        stems holds (x_offset, duration_type), with x offsets relative to the
+        measure's first beat.
+        """
+        voices = measure.get('voices', [])
+        if not voices:
+            return (), ()
+        beats = voices[0].get('beats', [])
+        if not beats:
+            return (), ()
+        
+        ratios = []
+        for beat in beats:
+            duration = beat.get('duration', [1, 4])
+            ratios.append(duration[0] / duration[1])
+        total_duration = sum(ratios)
+        if total_duration == 0:
+            total_duration = 1
+        
+        notes = []
+        stems = []
+        beat_x = 0.0
+        for beat, ratio in zip(beats, ratios):
+            beat_width = usable_measure_width * (ratio / total_duration)
+            note_x = beat_x + beat_width * 0.3
+            
+            has_notes = False
+            for note in beat.get('notes', []):
+                fret = note.get('fret')
+                if fret is None or note.get('rest'):
+                    continue
+                has_notes = True
+                notes.append((note_x, int(float(note.get('string', 0))), fret))
+            
+            if has_notes:
+                stems.append((note_x, beat.get('type', 4)))
+            beat_x += beat_width
+        
+        return notes, stems
+    
+    def _index_tempo_changes(self, automations):
+        """Build sorted measure/BPM lookup lists from the tempo automations."""
+        tempo_changes = sorted(automations.get('tempo', []), key=lambda tc: tc.get('measure', 0))
+        self._tempo_measures = [tc.get('measure', 0) for tc in tempo_changes]
+        self._tempo_bpms = [tc.get('bpm', 120) for tc in tempo_changes]
+    
+    def _get_tempo_at_measure(self, measure_idx):
         """Get the tempo (BPM) at a given measure."""
-        tempo_changes = automations.get('tempo', [])
-        current_bpm = 120
-        for tc in tempo_changes:
-            if tc.get('measure', 0) <= measure_idx:
-                current_bpm = tc.get('bpm', 120)
-            else:
-                break
-        return current_bpm
+        i = bisect.bisect_right(self._tempo_measures, measure_idx) - 1
+        return self._tempo_bpms[i] if i >= 0 else 120
     
-    def _draw_rhythm_stem(self, c, x, y, duration_type, is_beam_start=False, is_beam_stop=False, beam_group=None):
-        """Draw rhythm notation below the tab."""
+    def _draw_rhythm_stem(self, lines, x, y, duration_type, is_beam_start=False, is_beam_stop=False, beam_group=None):
+        """Queue rhythm notation segments below the tab onto `lines`."""
         mm = self.mm
-        stem_y = y - 3 * mm
-        stem_height = 4 * mm
+        two_mm = self._2mm
+        stem_y = y - self._3mm
+        stem_height = self._4mm
         
-        c.setLineWidth(0.8)
-        c.line(x, stem_y, x, stem_y - stem_height)
+        lines.append((x, stem_y, x, stem_y - stem_height))
         
         if duration_type >= 8:
             flag_y = stem_y - stem_height
             if duration_type == 8:
-                c.line(x, flag_y, x + 2*mm, flag_y + 1.5*mm)
+                lines.append((x, flag_y, x + two_mm, flag_y + 1.5*mm))
             elif duration_type == 16:
-                c.line(x, flag_y, x + 2*mm, flag_y + 1.5*mm)
-                c.line(x, flag_y + 1.2*mm, x + 2*mm, flag_y + 2.7*mm)
+                lines.append((x, flag_y, x + two_mm, flag_y + 1.5*mm))
+                lines.append((x, flag_y + 1.2*mm, x + two_mm, flag_y + 2.7*mm))
             elif duration_type >= 32:
-                c.line(x, flag_y, x + 2*mm, flag_y + 1.5*mm)
-                c.line(x, flag_y + 1*mm, x + 2*mm, flag_y + 2.5*mm)
-                c.line(x, flag_y + 2*mm, x + 2*mm, flag_y + 3.5*mm)
+                lines.append((x, flag_y, x + two_mm, flag_y + 1.5*mm))
+                lines.append((x, flag_y + 1*mm, x + two_mm, flag_y + 2.5*mm))
+                lines.append((x, flag_y + 2*mm, x + two_mm, flag_y + 3.5*mm))
+    
+    def _stroke_lines(self, c, lines, color, width):
+        """Stroke a list of (x1, y1, x2, y2) segments as a single path."""
+        if not lines:
+            return
+        p = c.beginPath()
+        for x1, y1, x2, y2 in lines:
+            p.moveTo(x1, y1)
+            p.lineTo(x2, y2)
+        c.setStrokeColor(color)
+        c.setLineWidth(width)
+        c.drawPath(p, stroke=1, fill=0)
+    
+    def _flush_batch(self, c, batch):
+        """Draw queued page geometry, setting each graphics state once per group."""
+        black, gray, white = self._black, self._gray, self._white
+        
+        self._stroke_lines(c, batch['staff'], gray, 0.5)
+        self._stroke_lines(c, batch['bars'], black, 1)
+        self._stroke_lines(c, batch['stems'], black, 0.8)
+        
+        if batch['backgrounds']:
+            p = c.beginPath()
+            for x, y, w, h in batch['backgrounds']:
+                p.rect(x, y, w, h)
+            c.setFillColor(white)
+            c.drawPath(p, stroke=0, fill=1)
+        
+        c.setFillColor(black)
+        if batch['glyphs']:
+            t = c.beginText()
+            t.setFont("Courier-Bold", 9)
+            for x, y, s in batch['glyphs']:
+                t.setTextOrigin(x, y)
+                t.textOut(s)
+            c.drawText(t)
+        
+        for group in batch.values():
+            group.clear()
     
     def _draw_time_signature(self, c, x, y, signature, num_strings):
         """Draw time signature at the start of a line."""
@@ -119,20 +355,34 @@ class TabToPDF:
         c.setFont("Helvetica", 8)
         c.drawString(x, y + 4*mm, f"♩= {bpm}")
         
+    def load_track(self, json_path):
+        """Read and parse a track JSON file."""
+        with open(json_path, 'rb') as f:
+            return _loads(f.read())
+    
+    def create_canvas(self, output_path):
+        """Create a canvas for output_path using this converter's page size."""
+        return self._canvas_cls(output_path, pagesize=self.page_size)
+    
     def convert(self, json_path, output_path, track_info=None):
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.colors import black, gray, lightgrey, white
-        
-        mm = self.mm
-        
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        """Convert a single track JSON file into its own PDF."""
+        c = self.create_canvas(output_path)
+        if not self.render(c, self.load_track(json_path), track_info):
+            return None
+        c.save()
+        return output_path
+    
+    def render(self, c, data, track_info=None):
+        """Draw one track onto canvas c, finishing with a page break. Returns False if it has no measures."""
+        if not isinstance(data, dict) or not isinstance(data.get('measures', []), list):
+            raise ValueError("track data must be an object with a 'measures' list")
         
         measures = data.get('measures', [])
         if not measures:
-            return None
+            return False
         
         automations = data.get('automations', {})
+        self._index_tempo_changes(automations)
         
         num_strings = data.get('strings', 6)
         if track_info and track_info.get('tuning'):
@@ -158,7 +408,21 @@ class TabToPDF:
         
         start_measure = self._find_first_content_measure(measures)
         
-        c = canvas.Canvas(output_path, pagesize=self.page_size)
+        batch = {'staff': [], 'bars': [], 'stems': [], 'backgrounds': [], 'glyphs': []}
+        try:
+            self._draw_track(c, batch, data, track_info, measures, num_strings, tuning, is_drums, start_measure)
+        finally:
+            # Close whatever page was started, including on failure, so the
+            # next track begins on a clean page with this one fully drawn.
+            self._flush_batch(c, batch)
+            c.showPage()
+        return True
+    
+    def _draw_track(self, c, batch, data, track_info, measures, num_strings, tuning, is_drums, start_measure):
+        """Draw the header and measures of one track, queueing geometry onto batch."""
+        black, gray = self._black, self._gray
+        
+        mm = self.mm
         page_width, page_height = self.page_size
         
         y = page_height - self.margin
@@ -177,15 +441,17 @@ class TabToPDF:
         
         if tuning and not is_drums:
             c.setFont("Helvetica", 9)
-            tuning_str = "Tuning: " + " ".join([self.MIDI_TO_NOTE.get(m, '?') for m in reversed(tuning)])
+            tuning_str = "Tuning: " + " ".join([self.NOTE_NAMES[m % 12] for m in reversed(tuning)])
             c.drawString(self.margin, y, tuning_str)
         y -= 8 * mm
         
-        initial_bpm = self._get_tempo_at_measure(automations, start_measure)
+        initial_bpm = self._get_tempo_at_measure(start_measure)
         
         usable_width = page_width - 2 * self.margin - 15 * mm
         measure_width = usable_width / self.measures_per_line
         
+        usable_measure_width = measure_width - self._6mm
+        
         tab_x_start = self.margin + 15 * mm
         current_x = tab_x_start
         current_y = y
@@ -196,6 +462,24 @@ class TabToPDF:
         last_shown_tempo = None
         is_first_line = True
         
+        # Bind names used inside the measure loop once up front.
+        setFont = c.setFont
+        setFill = c.setFillColor
+        drawString = c.drawString
+        drawRightString = c.drawRightString
+        flatten = self._flatten_measure
+        fret_label = self._fret_label
+        draw_stem = self._draw_rhythm_stem
+        add_staff = batch['staff'].append
+        add_bar = batch['bars'].append
+        add_background = batch['backgrounds'].append
+        add_glyph = batch['glyphs'].append
+        stems = batch['stems']
+        ss = self.string_spacing
+        one_mm = self._1mm
+        three_mm = self._3mm
+        label_x = tab_x_start - three_mm
+        
         for measure_idx in range(start_measure, len(measures)):
             measure = measures[measure_idx]
             
@@ -206,6 +490,7 @@ class TabToPDF:
                 is_first_line = False
                 
                 if current_y < self.margin + line_height:
+                    self._flush_batch(c, batch)
                     c.showPage()
                     current_y = page_height - self.margin - 10 * mm
                     is_first_line = True
@@ -215,109 +500,71 @@ class TabToPDF:
                 current_signature = measure_signature
             
             if measure_count == 0:
-                c.setFont("Helvetica-Bold", 8)
-                c.setFillColor(black)
+                setFont("Helvetica-Bold", 8)
+                setFill(black)
                 if is_drums:
                     drum_labels = ['HH', 'SD', 'BD', 'T1', 'T2', 'CR', 'RD', 'CH']
                     for i in range(num_strings):
                         label = drum_labels[i] if i < len(drum_labels) else str(i+1)
-                        c.drawRightString(tab_x_start - 3*mm, current_y - i * self.string_spacing - 2, label)
+                        drawRightString(label_x, current_y - i * ss - 2, label)
                 elif tuning:
                     for i, midi in enumerate(tuning):
-                        label = self.MIDI_TO_NOTE.get(midi, '?')
-                        c.drawRightString(tab_x_start - 3*mm, current_y - i * self.string_spacing - 2, label)
+                        label = self.NOTE_NAMES[midi % 12]
+                        drawRightString(label_x, current_y - i * ss - 2, label)
                 else:
-                    for i, label in enumerate(['e', 'B', 'G', 'D', 'A', 'E'][:num_strings]):
-                        c.drawRightString(tab_x_start - 3*mm, current_y - i * self.string_spacing - 2, label)
+                    for i, label in enumerate(['E', 'B', 'G', 'D', 'A', 'E'][:num_strings]):
+                        drawRightString(label_x, current_y - i * ss - 2, label)
                 
                 if current_signature and (is_first_line or measure_idx == start_measure):
                     self._draw_time_signature(c, tab_x_start - 10*mm, current_y, current_signature, num_strings)
                 
-                current_tempo = self._get_tempo_at_measure(automations, measure_idx)
+                current_tempo = self._get_tempo_at_measure(measure_idx)
                 if current_tempo != last_shown_tempo:
                     self._draw_tempo_marking(c, current_x, current_y, current_tempo)
                     last_shown_tempo = current_tempo
             
-            c.setStrokeColor(gray)
-            c.setLineWidth(0.5)
             for i in range(num_strings):
-                line_y = current_y - i * self.string_spacing
-                c.line(current_x, line_y, current_x + measure_width, line_y)
-            
-            c.setStrokeColor(black)
-            c.setLineWidth(1)
-            bottom_y = current_y - (num_strings - 1) * self.string_spacing
-            c.line(current_x, current_y, current_x, bottom_y)
-            
-            c.line(current_x + measure_width, current_y, current_x + measure_width, bottom_y)
-            
-            c.setFont("Helvetica", 7)
-            c.setFillColor(gray)
-            c.drawString(current_x + 1*mm, current_y + 3*mm, str(measure_idx + 1))
-            c.setFillColor(black)
-            
-            voices = measure.get('voices', [])
-            if voices:
-                beats = voices[0].get('beats', [])
-                if beats:
-                    total_duration = sum(b.get('duration', [1,4])[0] / b.get('duration', [1,4])[1] for b in beats)
-                    if total_duration == 0:
-                        total_duration = 1
-                    
-                    usable_measure_width = measure_width - 6*mm
-                    beat_x = current_x + 3*mm
-                    
-                    for beat_idx, beat in enumerate(beats):
-                        duration = beat.get('duration', [1, 4])
-                        duration_ratio = (duration[0] / duration[1]) / total_duration
-                        beat_width = usable_measure_width * duration_ratio
-                        
-                        note_x = beat_x + beat_width * 0.3
-                        
-                        notes = beat.get('notes', [])
-                        has_notes = False
-                        
-                        for note in notes:
-                            if note.get('rest'):
-                                continue
-                            fret = note.get('fret')
-                            string = note.get('string', 0)
-                            
-                            if fret is not None:
-                                has_notes = True
-                                string_idx = int(float(string))
-                                if string_idx < num_strings:
-                                    note_y = current_y - string_idx * self.string_spacing
-                                    fret_str = str(fret)
-                                    
-                                    text_width = c.stringWidth(fret_str, "Courier-Bold", 9)
-                                    c.setFillColor(white)
-                                    c.rect(note_x - text_width/2 - 1, note_y - 3, text_width + 2, 7, fill=1, stroke=0)
-                                    
-                                    c.setFillColor(black)
-                                    c.setFont("Courier-Bold", 9)
-                                    c.drawCentredString(note_x, note_y - 2.5, fret_str)
-                        
-                        if has_notes:
-                            duration_type = beat.get('type', 4)
-                            rhythm_y = current_y - (num_strings - 1) * self.string_spacing
-                            self._draw_rhythm_stem(c, note_x, rhythm_y, duration_type,
-                                                   beat.get('beamStart', False),
-                                                   beat.get('beamStop', False))
-                        
-                        beat_x += beat_width
+                line_y = current_y - i * ss
+                add_staff((current_x, line_y, current_x + measure_width, line_y))
+            
+            bottom_y = current_y - (num_strings - 1) * ss
+            add_bar((current_x, current_y, current_x, bottom_y))
+            add_bar((current_x + measure_width, current_y, current_x + measure_width, bottom_y))
+            
+            setFont("Helvetica", 7)
+            setFill(gray)
+            drawString(current_x + one_mm, current_y + three_mm, str(measure_idx + 1))
+            setFill(black)
+            
+            notes, beat_stems = flatten(measure, usable_measure_width)
+            beat_start = current_x + three_mm
+            
+            for note_x, string_idx, fret in notes:
+                if string_idx < num_strings:
+                    note_x += beat_start
+                    note_y = current_y - string_idx * ss
+                    fret_str, text_width = fret_label(c, fret)
+                    add_background((note_x - text_width/2 - 1, note_y - 3, text_width + 2, 7))
+                    add_glyph((note_x - text_width/2, note_y - 2.5, fret_str))
+            
+            for note_x, duration_type in beat_stems:
+                draw_stem(stems, beat_start + note_x, bottom_y, duration_type)
             
             current_x += measure_width
             measure_count += 1
-        
-        c.save()
-        return output_path
 
 
 class SongsterrDownloader:
     """Downloads tab data from Songsterr URLs."""
     
-    def __init__(self, headless: bool = True, verbose: bool = False, generate_pdf: bool = False):
+    MAX_DOWNLOAD_WORKERS = 8
+    # CloudFront host the Songsterr player loads track JSON from, as seen by
+    # _capture_network_urls. If Songsterr moves its CDN, the fast path falls
+    # back to the browser; run with -v to see the probed URL.
+    CDN_TRACK_URL = 'https://dqsljvtekg760.cloudfront.net/{song_id}/{revision_id}/{image}/{track_idx}.json'
+    
+    def __init__(self, headless: bool = True, verbose: bool = False, generate_pdf: bool = False,
+                 pretty_json: bool = False, per_track_pdf: bool = False):
         """
         Initialize the downloader.
         
@@ -325,10 +572,14 @@ class SongsterrDownloader:
             headless: Run browser in headless mode (no GUI)
             verbose: Print detailed debug information
             generate_pdf: Generate PDF tabs from downloaded JSON
+            pretty_json: Re-indent track JSON instead of saving it as served
+            per_track_pdf: Write one PDF per track instead of a single song PDF
         """
         self.headless = headless
         self.verbose = verbose
         self.generate_pdf = generate_pdf
+        self.pretty_json = pretty_json
+        self.per_track_pdf = per_track_pdf
         self.driver = None
         self.song_info = {}
         self.track_urls = []
@@ -348,6 +599,8 @@ class SongsterrDownloader:
         chrome_options.add_argument("--disable-blink-features=AutomationControlled")
         chrome_options.add_argument("--disable-infobars")
         chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         
@@ -355,7 +608,7 @@ class SongsterrDownloader:
         
         self._log("Starting Chrome browser...")
         self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
+            service=Service(_driver_path()),
             options=chrome_options
         )
         
@@ -365,7 +618,7 @@ class SongsterrDownloader:
     
     def _extract_song_info(self, page_source: str) -> dict:
         """Extract song metadata from page state."""
-        state_match = re.search(r'<script id="state"[^>]*>([^<]+)</script>', page_source)
+        state_match = _STATE_RE.search(page_source)
         
         if not state_match:
             self._log("No state script found in page")
@@ -373,7 +626,7 @@ class SongsterrDownloader:
         
         try:
             state_json = unquote(state_match.group(1))
-            state_data = json.loads(state_json)
+            state_data = _loads(state_json)
             
             if 'meta' in state_data and 'current' in state_data['meta']:
                 current = state_data['meta']['current']
@@ -384,6 +637,7 @@ class SongsterrDownloader:
                     'revision_id': current.get('revisionId'),
                     'tracks': current.get('tracks', []),
                     'default_track': current.get('defaultTrack'),
+                    'image': current.get('image'),
                 }
         except json.JSONDecodeError as e:
             self._log(f"Failed to parse state JSON: {e}")
@@ -396,28 +650,199 @@ class SongsterrDownloader:
         json_urls = set()
         
         for entry in logs:
+            message = entry.get('message')
+            if not isinstance(message, str) or 'cloudfront.net' not in message:
+                continue
             try:
-                log = json.loads(entry['message'])['message']
-                
-                if log['method'] in ['Network.requestWillBeSent', 'Network.responseReceived']:
-                    if log['method'] == 'Network.requestWillBeSent':
-                        url = log['params']['request']['url']
-                    else:
-                        url = log['params']['response']['url']
-                    
-                    if 'cloudfront.net' in url and url.endswith('.json'):
-                        json_urls.add(url)
-                        
-            except Exception:
+                decoded = _loads(message)
+            except ValueError:
+                continue
+            
+            log = decoded.get('message') if isinstance(decoded, dict) else None
+            if not isinstance(log, dict) or log.get('method') not in _NETWORK_METHODS:
                 continue
+            params = log.get('params')
+            if not isinstance(params, dict):
+                continue
+            target = params.get('request') or params.get('response')
+            url = target.get('url') if isinstance(target, dict) else None
+            
+            if isinstance(url, str) and url.endswith('.json') and 'cloudfront.net' in url:
+                json_urls.add(url)
         
-        return sorted(list(json_urls))
+        return sorted(json_urls)
+    
+    def _fast_fetch(self, session, url: str) -> bool:
+        """Fetch song metadata over plain HTTP and derive the track URLs from it."""
+        try:
+            response = session.get(url, timeout=15)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            self._log(f"Direct page fetch failed: {e}")
+            return False
+        
+        song_info = self._extract_song_info(response.text)
+        tracks = song_info.get('tracks')
+        if not (tracks and song_info.get('song_id') and song_info.get('revision_id') and song_info.get('image')):
+            self._log("Page state lacks the IDs needed to build track URLs")
+            return False
+        
+        track_urls = [
+            self.CDN_TRACK_URL.format(
+                song_id=song_info['song_id'],
+                revision_id=song_info['revision_id'],
+                image=song_info['image'],
+                track_idx=i
+            )
+            for i in range(len(tracks))
+        ]
+        
+        try:
+            probe = session.head(track_urls[0], timeout=10)
+        except requests.RequestException as e:
+            self._log(f"Track URL probe failed for {track_urls[0]}: {e}")
+            return False
+        if probe.status_code != 200:
+            self._log(f"Track URL probe returned HTTP {probe.status_code} for {track_urls[0]}")
+            return False
+        
+        self.song_info = song_info
+        self.track_urls = track_urls
+        return True
+    
+    def _browser_fetch(self, url: str):
+        """Load the page in Chrome and capture metadata and track URLs from it."""
+        self._setup_driver()
+        self.driver.get(url)
+        
+        # get_log() drains the performance buffer, so URLs seen while polling
+        # have to be accumulated rather than re-read at the end.
+        json_urls = set()
+        
+        def page_ready(driver):
+            json_urls.update(self._capture_network_urls())
+            return bool(json_urls) and bool(driver.find_elements(By.CSS_SELECTOR, 'script#state'))
+        
+        try:
+            WebDriverWait(self.driver, 15, poll_frequency=0.25).until(page_ready)
+            # Give requests for the remaining tracks a moment to follow the first one.
+            time.sleep(1)
+            json_urls.update(self._capture_network_urls())
+        except TimeoutException:
+            self._log("Timed out waiting for page state and track URLs")
+        
+        self.song_info = self._extract_song_info(self.driver.page_source)
+        if self.song_info:
+            self.track_urls = sorted(json_urls)
     
     def _sanitize_filename(self, name: str) -> str:
         """Create a safe filename from a string."""
-        safe = re.sub(r'[^\w\s-]', '', name)
-        safe = re.sub(r'[-\s]+', '_', safe)
-        return safe.strip('_').lower()
+        safe = name.translate(_SANITIZE_TABLE)
+        if not safe.isascii():
+            safe = _NON_WORD_RE.sub('', safe)
+        return '_'.join(safe.split()).strip('_').lower()
+    
+    def _plan_track_files(self, track_names: dict) -> list:
+        """Map track URLs to (url, track_name, track_idx), keeping one URL per file name."""
+        jobs = []
+        seen = set()
+        for i, json_url in enumerate(self.track_urls):
+            match = _TRACK_IDX_RE.search(json_url)
+            if match:
+                track_idx = int(match.group(1))
+                track_name = track_names.get(track_idx, f'track_{track_idx}')
+            else:
+                track_idx = None
+                track_name = f'unknown_{i}'
+            
+            if track_name in seen:
+                self._log(f"Skipping {json_url}: another URL already maps to {track_name}.json")
+                continue
+            seen.add(track_name)
+            jobs.append((json_url, track_name, track_idx))
+        return jobs
+    
+    def _fetch_track(self, session, json_url: str, track_name: str, track_idx, output_dir: str) -> dict:
+        """Download a single track JSON file and return its file entry."""
+        filename = f"{track_name}.json"
+        filepath = os.path.join(output_dir, filename)
+        
+        with session.get(json_url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            
+            file_size = 0
+            try:
+                with open(filepath, 'wb') as f:
+                    if self.pretty_json:
+                        file_size = f.write(_dumps_indented(_loads(response.content)))
+                    else:
+                        for chunk in response.iter_content(65536):
+                            file_size += f.write(chunk)
+            except BaseException:
+                # Don't leave a truncated track file behind.
+                try:
+                    os.remove(filepath)
+                except OSError:
+                    pass
+                raise
+        
+        return {
+            'name': filename,
+            'path': filepath,
+            'size': file_size,
+            'track_index': track_idx,
+            'url': json_url
+        }
+    
+    def _pdf_track_info(self, file_info: dict):
+        """Build the TabToPDF track_info for a downloaded track file."""
+        tracks = self.song_info.get('tracks', [])
+        track_idx = file_info.get('track_index')
+        if track_idx is None or track_idx >= len(tracks):
+            return None
+        
+        track = tracks[track_idx]
+        return {
+            'title': self.song_info.get('title', ''),
+            'artist': self.song_info.get('artist', ''),
+            'instrument': track.get('title') or track.get('instrument', ''),
+            'tuning': track.get('tuning'),
+        }
+    
+    def _generate_pdfs(self, json_files: list, song_pdf_path: str, errors: list):
+        """Render downloaded tracks into one song PDF, or one PDF per track."""
+        print("Generating PDFs...", end=' ', flush=True)
+        converter = TabToPDF()
+        
+        if self.per_track_pdf:
+            pdf_count = 0
+            for file_info in json_files:
+                try:
+                    pdf_path = file_info['path'].rsplit('.', 1)[0] + '.pdf'
+                    converter.convert(file_info['path'], pdf_path, self._pdf_track_info(file_info))
+                    pdf_count += 1
+                except Exception as e:
+                    errors.append(f"PDF failed: {file_info['name']}")
+                    self._log(f"PDF generation failed for {file_info['name']}: {e}")
+            print(f"{pdf_count} PDFs")
+            return
+        
+        c = converter.create_canvas(song_pdf_path)
+        track_count = 0
+        for file_info in json_files:
+            try:
+                data = converter.load_track(file_info['path'])
+                if converter.render(c, data, self._pdf_track_info(file_info)):
+                    track_count += 1
+            except Exception as e:
+                errors.append(f"PDF failed: {file_info['name']}")
+                self._log(f"PDF generation failed for {file_info['name']}: {e}")
+        
+        if track_count:
+            c.save()
+            print(f"{track_count} tracks -> {os.path.basename(song_pdf_path)}")
+        else:
+            print("0 PDFs")
     
     def download(self, url: str, output_dir: str = None) -> dict:
         """
@@ -437,18 +862,14 @@ class SongsterrDownloader:
             'errors': []
         }
         
+        session = _SESSION
+        
         try:
-            self._setup_driver()
-            
             print(f"Loading {url}")
-            self.driver.get(url)
+            if not self._fast_fetch(session, url):
+                self._log("Falling back to browser capture")
+                self._browser_fetch(url)
             
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            time.sleep(5)
-            
-            self.song_info = self._extract_song_info(self.driver.page_source)
             result['song_info'] = self.song_info
             
             if not self.song_info:
@@ -457,16 +878,15 @@ class SongsterrDownloader:
             
             print(f"{self.song_info['artist']} - {self.song_info['title']} ({len(self.song_info.get('tracks', []))} tracks)")
             
-            self.track_urls = self._capture_network_urls()
             self._log(f"Found {len(self.track_urls)} JSON URLs")
             
             if not self.track_urls:
-                result['errors'].append("No track URLs found in network logs")
+                result['errors'].append("No track URLs found")
                 return result
             
+            artist_safe = self._sanitize_filename(self.song_info['artist'])
+            title_safe = self._sanitize_filename(self.song_info['title'])
             if output_dir is None:
-                artist_safe = self._sanitize_filename(self.song_info['artist'])
-                title_safe = self._sanitize_filename(self.song_info['title'])
                 output_dir = os.path.join(os.getcwd(), f"{artist_safe}_{title_safe}")
             
             os.makedirs(output_dir, exist_ok=True)
@@ -477,94 +897,61 @@ class SongsterrDownloader:
                 name = track.get('title') or track.get('name') or track.get('instrument') or f'track_{i}'
                 track_names[i] = f"{i:02d}_{self._sanitize_filename(name)}"
             
-            total = len(self.track_urls)
+            jobs = self._plan_track_files(track_names)
+            total = len(jobs)
+            
+            downloaded = {}
+            last_print = 0.0
             
-            for i, json_url in enumerate(self.track_urls):
-                progress = int((i + 1) / total * 30)
-                bar = '#' * progress + '-' * (30 - progress)
-                print(f"\r[{bar}] {i+1}/{total}", end='', flush=True)
+            with ThreadPoolExecutor(max_workers=self.MAX_DOWNLOAD_WORKERS) as executor:
+                futures = {
+                    executor.submit(self._fetch_track, session, json_url, track_name, track_idx, output_dir): (i, json_url)
+                    for i, (json_url, track_name, track_idx) in enumerate(jobs)
+                }
                 
-                try:
-                    match = re.search(r'/(\d+)\.json$', json_url)
-                    if match:
-                        track_idx = int(match.group(1))
-                        track_name = track_names.get(track_idx, f'track_{track_idx}')
-                    else:
-                        track_name = f'unknown_{len(result["files"])}'
-                    
-                    response = requests.get(json_url, timeout=30)
-                    response.raise_for_status()
+                for done, future in enumerate(as_completed(futures), 1):
+                    now = time.monotonic()
+                    if now - last_print > 0.1 or done == total:
+                        progress = int(done / total * 30)
+                        bar = '#' * progress + '-' * (30 - progress)
+                        sys.stdout.write(f"\r[{bar}] {done}/{total}")
+                        sys.stdout.flush()
+                        last_print = now
                     
-                    filename = f"{track_name}.json"
-                    filepath = os.path.join(output_dir, filename)
-                    
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        data = response.json()
-                        json.dump(data, f, indent=2)
-                    
-                    file_size = os.path.getsize(filepath)
-                    result['files'].append({
-                        'name': filename,
-                        'path': filepath,
-                        'size': file_size,
-                        'track_index': track_idx if match else None,
-                        'url': json_url
-                    })
-                    
-                except requests.RequestException as e:
-                    result['errors'].append(f"Failed: {json_url}")
-                except Exception as e:
-                    result['errors'].append(f"Error: {json_url}")
+                    i, json_url = futures[future]
+                    try:
+                        downloaded[i] = future.result()
+                    except requests.RequestException as e:
+                        result['errors'].append(f"Failed: {json_url}")
+                    except Exception as e:
+                        result['errors'].append(f"Error: {json_url}")
+            
+            result['files'].extend(downloaded[i] for i in sorted(downloaded))
             
             print()
             
             metadata_path = os.path.join(output_dir, 'metadata.json')
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'url': url,
-                    'song_info': self.song_info,
-                    'downloaded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'files': [f['name'] for f in result['files']]
-                }, f, indent=2)
+            metadata = _dumps_indented({
+                'url': url,
+                'song_info': self.song_info,
+                'downloaded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'files': [f['name'] for f in result['files']]
+            })
+            with open(metadata_path, 'wb') as f:
+                f.write(metadata)
             
             result['files'].append({
                 'name': 'metadata.json',
                 'path': metadata_path,
-                'size': os.path.getsize(metadata_path)
+                'size': len(metadata)
             })
             
             result['success'] = len(result['files']) > 1
             
             if self.generate_pdf and result['success']:
-                pdf_count = 0
-                tracks = self.song_info.get('tracks', [])
                 json_files = [f for f in result['files'] if f['name'].endswith('.json') and f['name'] != 'metadata.json']
-                
-                print("Generating PDFs...", end=' ', flush=True)
-                
-                for file_info in json_files:
-                    try:
-                        track_idx = file_info.get('track_index')
-                        track_info = None
-                        
-                        if track_idx is not None and track_idx < len(tracks):
-                            track = tracks[track_idx]
-                            track_info = {
-                                'title': self.song_info.get('title', ''),
-                                'artist': self.song_info.get('artist', ''),
-                                'instrument': track.get('title') or track.get('instrument', ''),
-                                'tuning': track.get('tuning'),
-                            }
-                        
-                        pdf_path = file_info['path'].rsplit('.', 1)[0] + '.pdf'
-                        converter = TabToPDF()
-                        converter.convert(file_info['path'], pdf_path, track_info)
-                        pdf_count += 1
-                        
-                    except Exception as e:
-                        self._log(f"PDF generation failed for {file_info['name']}: {e}")
-                
-                print(f"{pdf_count} PDFs")
+                song_pdf_path = os.path.join(output_dir, f"{artist_safe}_{title_safe}.pdf")
+                self._generate_pdfs(json_files, song_pdf_path, result['errors'])
             
             if result['success']:
                 total_size = sum(f.get('size', 0) for f in result['files'])
@@ -622,6 +1009,16 @@ Examples:
         action='store_true',
         help='Generate PDF tablature files'
     )
+    parser.add_argument(
+        '--per-track-pdf',
+        action='store_true',
+        help='With --pdf, write one PDF per track instead of a single song PDF'
+    )
+    parser.add_argument(
+        '--pretty-json',
+        action='store_true',
+        help='Save track JSON indented instead of as served'
+    )
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -632,6 +1029,7 @@ Examples:
     
     if args.pdf:
         ensure_packages(include_pdf=True)
+        _import_pdf_packages()
     
     if not validate_url(args.url):
         print("Invalid URL. Expected: https://www.songsterr.com/a/wsa/<artist>-<song>-tab-s<id>")
@@ -640,7 +1038,9 @@ Examples:
     downloader = SongsterrDownloader(
         headless=not args.no_headless,
         verbose=args.verbose,
-        generate_pdf=args.pdf
+        generate_pdf=args.pdf,
+        pretty_json=args.pretty_json,
+        per_track_pdf=args.per_track_pdf
     )
     
     result = downloader.download(args.url, args.output)